@@ -0,0 +1,227 @@
+import asyncio
+from functools import partial
+from weakref import WeakKeyDictionary
+
+from PIL import Image
+
+from pipeline import tokenize
+from prewarm import prewarm_from_file
+from png import alphabet as png_alphabet
+from png import write as png_write
+from svg import write as svg_write
+
+
+class Renderer:
+    def __init__(self, executor=None, limit=4, on_line=None):
+        """
+        Render documents without blocking the event loop. Each line is
+        drawn in `executor`, one at a time, so a render can be cancelled
+        between lines. The canvas and file writes are handled in a
+        thread of this process, so `executor` may be a process pool.
+
+        :param executor: A concurrent.futures executor, or None to use
+            the event loop's default executor
+        :param limit: Largest number of documents rendered at once in
+            each event loop
+        :param on_line: A function called with (row, number of rows)
+            after each line of a document is drawn, or None
+        """
+
+        self.executor = executor
+        self.limit = limit
+        self.on_line = on_line
+        # a semaphore can only be used in one event loop
+        self.semaphores = WeakKeyDictionary()
+
+    @property
+    def semaphore(self):
+        """The semaphore that limits renders in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in self.semaphores:
+            self.semaphores[loop] = asyncio.Semaphore(self.limit)
+        return self.semaphores[loop]
+
+    async def run(self, function, *args):
+        """Run `function(*args)` in the executor and wait for it."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def line_done(self, row, rows):
+        if self.on_line is not None:
+            self.on_line(row, rows)
+
+    async def prewarm(self, filename, **kwargs):
+        """
+        Fill the syllable caches from a profile, before serving renders.
+        Only the caches of this process are filled, so this does nothing
+        for renders in a process pool executor.
+
+        :param filename: Path of a profile written by
+            `prewarm.write_profile`
+        :param kwargs: Budget and options, see `prewarm.prewarm`
+        :return: See `prewarm.prewarm`
+        """
+
+        return await self.run(partial(prewarm_from_file, filename, **kwargs))
+
+    async def transcribe(self, text, filename=None):
+        """
+        Transcribe a text into a PNG image.
+
+        :param text: Text with syllables separated by spaces and lines
+            separated by newlines
+        :param filename: If given, save the image to this file
+        :return: An Image
+        """
+
+        async with self.semaphore:
+            lines = await self.run(tokenize, text)
+            width = max(len(line) for line in lines)
+            image = await asyncio.to_thread(
+                Image.new, 'RGBA',
+                (width * png_alphabet.syllable_width,
+                 len(lines) * png_alphabet.syllable_height),
+                (255, 255, 255, 255))
+            for row, line in enumerate(lines):
+                line_image = await self.run(png_write.create_text, [line])
+                # pasted here, since a process pool would paste into a copy
+                await asyncio.to_thread(
+                    image.paste, line_image,
+                    (0, row * png_alphabet.syllable_height))
+                self.line_done(row, len(lines))
+            if filename:
+                await asyncio.to_thread(image.save, filename)
+            return image
+
+    async def render_svg(self, text, filename=None, pretty=True,
+                         compress=None, merge=None, precision=None,
+                         dedupe=False, id_prefix=None):
+        """
+        Transcribe a text into an SVG.
+
+        :param text: Text with syllables separated by spaces and lines
+            separated by newlines
+        :param filename: If given, write the SVG to this file
+        :param pretty: See `svg.write.SVG.to_file`
+        :param compress: See `svg.write.SVG.to_file`
+        :param merge: See `svg.write.Text`
+        :param precision: See `svg.write.Text`
+        :param dedupe: See `svg.write.Text`
+        :param id_prefix: See `svg.write.Text`
+        :return: An `svg.write.SVG`
+        """
+
+        async with self.semaphore:
+            lines = await self.run(tokenize_svg, text)
+            sources = None
+            if dedupe:
+                sources = await self.run(svg_write.line_sources, lines)
+                if id_prefix is None:
+                    id_prefix = await self.run(
+                        svg_write.line_id_prefix, lines)
+            size = svg_write.syllable_size
+            width = max(len(line) for line in lines)
+            svg = svg_write.SVG(0, 0, width * size, len(lines) * size)
+            for row, line in enumerate(lines):
+                svg.append(await self.run(
+                    svg_write.create_text_line, line, row, sources,
+                    merge, precision, id_prefix))
+                self.line_done(row, len(lines))
+            if filename:
+                await asyncio.to_thread(
+                    svg.to_file, filename, pretty, compress)
+            return svg
+
+
+def tokenize_svg(text):
+    """Tokenize a text into lines for `svg.write.create_text_line`."""
+    return [svg_write.hashable_line(line) for line in tokenize(text)]
+
+
+renderer = None
+
+
+def get_renderer():
+    """Get the Renderer used by the module-level functions."""
+    global renderer
+    if renderer is None:
+        renderer = Renderer()
+    return renderer
+
+
+async def prewarm(filename, **kwargs):
+    """See `Renderer.prewarm`."""
+    return await get_renderer().prewarm(filename, **kwargs)
+
+
+async def transcribe(text, filename=None):
+    """See `Renderer.transcribe`."""
+    return await get_renderer().transcribe(text, filename)
+
+
+async def render_svg(text, filename=None, **kwargs):
+    """See `Renderer.render_svg`."""
+    return await get_renderer().render_svg(text, filename, **kwargs)
+
+
+if __name__ == '__main__':
+    import time
+
+    anthem = (
+        "ju 'ar so swit\n"
+        "dan sin tu da bit\n"
+        "derz 'a mit mar kit\n"
+        "dawn da stit\n"
+        "da bojz 'and da gilz\n"
+        "wats its 'o der it")
+    max_delay = 0.05  # seconds the event loop may be late
+
+    async def measure_latency(done):
+        # how late the event loop wakes up from short sleeps
+        worst = 0
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - start - 0.001)
+        return worst
+
+    async def check_latency():
+        done = asyncio.Event()
+        latency = asyncio.create_task(measure_latency(done))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            [transcribe('\n'.join([anthem] * 10)) for _ in range(20)]
+            + [render_svg('\n'.join([anthem] * 10)) for _ in range(20)]))
+        done.set()
+        worst = await latency
+        print(f'40 renders in {time.perf_counter() - start:.2f} s, '
+              f'worst event loop delay {worst * 1000:.1f} ms')
+        assert worst < max_delay, 'the event loop was blocked'
+
+    async def check_cancel():
+        text = '\n'.join([anthem] * 100)
+        lines_drawn = []
+        renderer = Renderer(on_line=lambda row, rows: lines_drawn.append(row))
+        task = asyncio.create_task(renderer.transcribe(text))
+        while not lines_drawn:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError('the render was not cancelled')
+        drawn = len(lines_drawn)
+        await asyncio.sleep(0.1)
+        print(f'cancelled after {drawn} of {text.count(chr(10)) + 1} lines')
+        assert len(lines_drawn) == drawn, 'lines were drawn after cancelling'
+        assert drawn < text.count('\n') + 1, 'every line was drawn'
+
+    async def check_new_loop():
+        # the module-level renderer was used by another event loop
+        await asyncio.gather(*[transcribe(anthem) for _ in range(8)])
+
+    asyncio.run(check_latency())
+    asyncio.run(check_cancel())
+    asyncio.run(check_new_loop())
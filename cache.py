@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import unicodedata
+
+from png import write as png_write
+from svg import write as svg_write
+
+directory = os.path.dirname(os.path.abspath(__file__))
+# files that change how a text is rendered
+asset_files = [
+    os.path.join(directory, 'png', name)
+    for name in ('alphabet.py', 'write.py', 'consonants.png', 'vowels.png')
+] + [
+    os.path.join(directory, 'svg', name)
+    for name in ('alphabet.py', 'shapes.py', 'write.py')]
+
+
+def asset_version():
+    """
+    Hash the glyph assets and rendering code.
+
+    :return: A hex digest that changes when any of them change
+    """
+
+    digest = hashlib.sha256()
+    for filename in asset_files:
+        with open(filename, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def normalize(text):
+    """
+    Normalize a text so that texts that render the same get the same
+    key: Unicode NFC, single spaces between syllables and no trailing
+    whitespace.
+    """
+
+    text = unicodedata.normalize('NFC', text)
+    return '\n'.join(' '.join(line.split()) for line in text.split('\n'))
+
+
+class RenderCache:
+    def __init__(self, directory, max_bytes=1024 ** 3, link=False):
+        """
+        A cache of rendered files on disk, shared by every process that
+        uses the same directory.
+
+        :param directory: Directory to keep the cached files in
+        :param max_bytes: Largest total size of the cached files. The
+            least recently used files are removed past this size.
+        :param link: If True, hit results are hard links to the cached
+            file instead of copies. The output must then never be
+            modified in place.
+        """
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.link = link
+        self.version = asset_version()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, text, backend, **options):
+        """
+        Get the cache key of a render.
+
+        :param text: Text to render
+        :param backend: 'png' or 'svg'
+        :param options: Output options that change the rendered file
+        :return: A hex digest
+        """
+
+        data = json.dumps(
+            [normalize(text), backend, options, self.version],
+            sort_keys=True)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def get(self, key, extension, filename):
+        """
+        Copy a cached file to `filename`, if it is cached.
+
+        :return: True if the file was cached
+        """
+
+        path = self.path(key, extension)
+        try:
+            # mark as recently used first, so that it is not evicted next
+            os.utime(path)
+            self.deliver(path, filename)
+        except FileNotFoundError:
+            if os.path.exists(path):
+                raise  # the output directory is missing, not the file
+            # not cached, or evicted by another process
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def deliver(self, path, filename):
+        """Copy or link a cached file to `filename`."""
+        if self.link:
+            if os.path.lexists(filename):
+                os.remove(filename)
+            os.link(path, filename)
+        else:
+            shutil.copyfile(path, filename)
+
+    def put(self, key, extension, render, filename=None):
+        """
+        Render a file into the cache.
+
+        :param render: A function that writes the file to the filename
+            it is given
+        :param filename: If given, also copy or link the file here. It
+            is delivered before anything is evicted, so it arrives even
+            if the file is larger than `max_bytes`.
+        :return: Path of the cached file
+        """
+
+        path = self.path(key, extension)
+        fd, temp = tempfile.mkstemp(
+            dir=self.directory, prefix='.', suffix=extension)
+        os.close(fd)
+        try:
+            render(temp)
+            if filename:
+                # from the private file, which no other process evicts
+                self.deliver(temp, filename)
+            # other processes never see a partly written file
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def render(self, key, extension, filename, render):
+        """
+        Get a file from the cache, or render it into the cache first.
+
+        :param render: A function that writes the file to the filename
+            it is given
+        """
+
+        if not self.get(key, extension, filename):
+            self.put(key, extension, render, filename)
+
+    def entries(self):
+        """Get a list of (mtime, size, path) of the cached files."""
+        entries = []
+        with os.scandir(self.directory) as files:
+            for entry in files:
+                if entry.name.startswith('.'):
+                    continue  # still being written
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Remove the least recently used files past `max_bytes`.
+
+        :param keep: Path of a file to never remove, like one that was
+            just written
+        """
+
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # removed by another process
+            total -= size
+
+    def stats(self):
+        """
+        Get statistics for this cache object.
+
+        :return: A dict of hits, misses, hit rate, and the number and
+            total size of the cached files
+        """
+
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0,
+            'files': len(entries),
+            'bytes': sum(size for _, size, _ in entries)}
+
+
+def transcribe(text, filename, cache, scale=1, format=None, mono=False):
+    """
+    Like `png.write.transcribe`, but through a RenderCache.
+    """
+
+    if format is None:
+        # what Pillow would pick from the file name
+        extension = os.path.splitext(filename)[1] or '.png'
+    else:
+        extension = '.' + format.lower()
+    key = cache.key(text, 'png', scale=scale, format=format, mono=mono)
+    cache.render(
+        key, extension, filename,
+        lambda path: png_write.transcribe(
+            normalize(text), path, scale, format, mono))
+
+
+def render_svg(text, filename, cache, pretty=True, compress=None,
+               merge=None, precision=None, dedupe=False):
+    """
+    Write an `svg.write.Text` to a file through a RenderCache.
+    """
+
+    if compress is None:
+        compress = filename.endswith('.svgz')
+    key = cache.key(
+        text, 'svg', pretty=pretty, compress=compress,
+        merge=merge, precision=precision, dedupe=dedupe)
+    cache.render(
+        key, '.svgz' if compress else '.svg', filename,
+        lambda path: svg_write.Text(
+            normalize(text), merge=merge, precision=precision,
+            dedupe=dedupe).to_file(
+                path, pretty=pretty, compress=compress))
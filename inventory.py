@@ -0,0 +1,160 @@
+import itertools
+import json
+from functools import partial
+from multiprocessing import Pool
+from xml.etree import ElementTree
+
+from PIL import Image
+
+from pipeline import syllable_name, tokenize
+from png import alphabet
+from png import write as png_write
+from png.canvas import MappedCanvas
+from svg import write as svg_write
+
+
+def all_syllables():
+    """
+    Yield every syllable the script can write: any vowel with up to two
+    consonants on each side. Syllables that can't come out of the
+    tokenizer, like 'g' followed by 'h' (always read as 'gh'), are
+    left out.
+    """
+
+    clusters = [
+        cluster
+        for length in range(3)
+        for cluster in itertools.product(
+            alphabet.consonant_order, repeat=length)]
+    for nucleus in alphabet.vowel_order:
+        for onset in clusters:
+            for coda in clusters:
+                syllable = (onset, nucleus, coda)
+                if png_write.parse_syllable(
+                        syllable_name(syllable)) == syllable:
+                    yield syllable
+
+
+def corpus_syllables(text):
+    """
+    Get every distinct syllable in a text.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :return: A sorted list of (onset, nucleus, coda) tuples
+    """
+
+    return sorted({
+        syllable for line in tokenize(text) for syllable in line})
+
+
+def render_band(syllables, scale):
+    """Render one row of a sprite sheet and return its raw RGBA pixels."""
+    return png_write.create_text([syllables], scale).tobytes()
+
+
+def render_symbols(numbered_syllables, merge, precision):
+    """
+    Render SVG <symbol> elements.
+
+    :param numbered_syllables: A list of (number, syllable), where the
+        number is used for the id of the symbol
+    :return: A string of <symbol> elements
+    """
+
+    symbols = []
+    for i, syllable in numbered_syllables:
+        symbol = ElementTree.Element('symbol', attrib={
+            'id': f's{i}',
+            'viewBox': (
+                f'0 0 {svg_write.syllable_size} {svg_write.syllable_size}')})
+        symbol.append(svg_write.create_line_element(
+            [syllable], merge=merge, precision=precision))
+        symbols.append(ElementTree.tostring(symbol, encoding='unicode'))
+    return ''.join(symbols)
+
+
+def write_inventory(syllables, sprite_filename, svg_filename,
+                    index_filename, columns=64, scale=1,
+                    merge='syllable', precision=2, buffer_filename=None,
+                    workers=None):
+    """
+    Render a set of syllables into a PNG sprite sheet and an SVG symbol
+    library, with a JSON index of where each syllable is.
+
+    :param syllables: A list of (onset, nucleus, coda) tuples
+    :param sprite_filename: Path of the PNG sprite sheet
+    :param svg_filename: Path of the SVG symbol library
+    :param index_filename: Path of the JSON index. It maps each syllable's
+        text to its 'x', 'y', 'width' and 'height' on the sprite sheet
+        and the id of its 'symbol'.
+    :param columns: Number of syllables in each row of the sprite sheet
+    :param scale: An integer scale factor for the sprite sheet
+    :param merge: See `svg.write.Text`
+    :param precision: See `svg.write.Text`
+    :param buffer_filename: If given, build the sprite sheet in a
+        memory-mapped file at this path instead of in memory, for
+        inventories too large for RAM
+    :param workers: Number of worker processes, or None for one per CPU
+    """
+
+    syllables = list(syllables)
+    width = alphabet.syllable_width * scale
+    height = alphabet.syllable_height * scale
+    bands = [
+        syllables[i:i + columns] for i in range(0, len(syllables), columns)]
+    size = (min(columns, len(syllables)) * width, len(bands) * height)
+    if buffer_filename:
+        sheet = MappedCanvas(buffer_filename, *size)
+    else:
+        sheet = Image.new('RGBA', size, (255, 255, 255, 255))
+
+    index = {}
+    with Pool(workers) as pool:
+        try:
+            band_pixels = pool.imap(
+                partial(render_band, scale=scale), bands)
+            for row, (band, pixels) in enumerate(zip(bands, band_pixels)):
+                sheet.paste(
+                    Image.frombytes(
+                        'RGBA', (len(band) * width, height), pixels),
+                    (0, row * height))
+                for column, syllable in enumerate(band):
+                    index[syllable_name(syllable)] = {
+                        'x': column * width, 'y': row * height,
+                        'width': width, 'height': height,
+                        'symbol': f's{row * columns + column}'}
+            sheet.save(sprite_filename)
+        finally:
+            sheet.close()
+
+        with open(svg_filename, 'w') as f:
+            f.write('<svg xmlns="http://www.w3.org/2000/svg">')
+            f.writelines(pool.imap(
+                partial(render_symbols, merge=merge, precision=precision),
+                [list(enumerate(band, row * columns))
+                 for row, band in enumerate(bands)]))
+            f.write('</svg>')
+
+    with open(index_filename, 'w') as f:
+        json.dump(index, f)
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    if not os.path.isdir('tests'):
+        os.mkdir('tests')
+
+    if len(sys.argv) > 1:
+        # only the syllables used in a corpus file
+        with open(sys.argv[1]) as f:
+            inventory = corpus_syllables(f.read())
+        write_inventory(
+            inventory, 'tests/sprites.png', 'tests/symbols.svg',
+            'tests/sprites.json')
+    else:
+        write_inventory(
+            all_syllables(), 'tests/sprites.png', 'tests/symbols.svg',
+            'tests/sprites.json', buffer_filename='tests/sprites.rgba')
@@ -0,0 +1,292 @@
+from xml.etree import ElementTree
+
+from PIL import Image
+
+from png import alphabet as png_alphabet
+from png import write as png_write
+from svg import write as svg_write
+
+
+def tokenize(text):
+    """
+    Split a text into lines of parsed syllables.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :return: A list of lines, each a list of (onset, nucleus, coda) tuples
+    """
+
+    return [
+        [png_write.parse_syllable(string)
+         for string in line.split(' ') if string]
+        for line in text.split('\n')]
+
+
+def syllable_name(syllable):
+    """Get the text of an (onset, nucleus, coda) tuple."""
+    onset, nucleus, coda = syllable
+    return ''.join(onset) + nucleus + ''.join(coda)
+
+
+def measure(text, backend='png', scale=1, boxes=False):
+    """
+    Measure the output of a text without tokenizing syllables or
+    creating any images or shapes.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :param backend: 'png' for pixels or 'svg' for viewBox units
+    :param scale: An integer scale factor, for 'png'
+    :param boxes: If True, include the box of every syllable
+    :return: A dict of the output 'width' and 'height', the number of
+        'lines' and 'syllables', and if `boxes` is True, 'boxes': a list
+        of (x, y, width, height) for each syllable in reading order
+    """
+
+    cell_width, cell_height = layout_size(1, 1, backend, scale)
+    # same as the number of syllables tokenize() finds on each line
+    columns = [
+        sum(1 for string in line.split(' ') if string)
+        for line in text.split('\n')]
+    width, height = layout_size(max(columns), len(columns), backend, scale)
+    metrics = {
+        'width': width,
+        'height': height,
+        'lines': len(columns),
+        'syllables': sum(columns)}
+    if boxes:
+        metrics['boxes'] = [
+            (column * cell_width, row * cell_height, cell_width, cell_height)
+            for row, count in enumerate(columns)
+            for column in range(count)]
+    return metrics
+
+
+def layout_size(columns, rows, backend='png', scale=1):
+    """
+    Get the size of the output of a grid of syllables.
+
+    :param columns: Number of syllables in the longest line
+    :param rows: Number of lines
+    :param backend: See `measure`
+    :param scale: See `measure`
+    :return: A tuple of (width, height)
+    """
+
+    if backend == 'png':
+        return (
+            columns * png_alphabet.syllable_width * scale,
+            rows * png_alphabet.syllable_height * scale)
+    elif backend == 'svg':
+        return (
+            columns * svg_write.syllable_size,
+            rows * svg_write.syllable_size)
+    raise ValueError(f'Unknown backend: {backend!r}')
+
+
+class Document:
+    def __init__(self, text):
+        """
+        A text that has been tokenized and laid out once, ready to be
+        rendered by any number of backends.
+
+        :param text: Text with syllables separated by spaces and lines
+            separated by newlines
+        """
+
+        self.lines = tokenize(text)
+        # size of the syllable grid
+        self.columns = max(len(line) for line in self.lines)
+        self.rows = len(self.lines)
+
+    def syllables(self):
+        """Yield (row, column, syllable) for every syllable."""
+        for row, line in enumerate(self.lines):
+            for column, syllable in enumerate(line):
+                yield row, column, syllable
+
+    def render(self, *backends):
+        """
+        Render this document with each backend.
+
+        :param backends: Backend objects with a `render(document)` method
+        :return: A list of each backend's result, in the same order
+        """
+
+        return [backend.render(self) for backend in backends]
+
+
+class PNGBackend:
+    def __init__(self, filename=None):
+        """
+        Render documents with the png glyph sheets.
+
+        :param filename: If given, save the image to this file
+        """
+
+        self.filename = filename
+
+    def render(self, document):
+        image = png_write.create_text(document.lines)
+        if self.filename:
+            image.save(self.filename)
+        return image
+
+
+class SVGBackend:
+    def __init__(self, filename=None, pretty=True, compress=None,
+                 **options):
+        """
+        Render documents with the svg shapes.
+
+        :param filename: If given, write the SVG to this file
+        :param pretty: See `svg.write.SVG.to_file`
+        :param compress: See `svg.write.SVG.to_file`
+        :param options: Other arguments for `svg.write.Text`
+        """
+
+        self.filename = filename
+        self.pretty = pretty
+        self.compress = compress
+        self.options = options
+
+    def render(self, document):
+        svg = svg_write.Text(document.lines, **self.options)
+        if self.filename:
+            svg.to_file(
+                self.filename, pretty=self.pretty, compress=self.compress)
+        return svg
+
+
+class MetricsBackend:
+    def render(self, document):
+        """
+        Measure a document without drawing it.
+
+        :return: A dict of counts and output sizes
+        """
+
+        return {
+            'lines': document.rows,
+            'syllables': sum(len(line) for line in document.lines),
+            'png_size': layout_size(document.columns, document.rows, 'png'),
+            'svg_size': layout_size(document.columns, document.rows, 'svg')}
+
+
+class EditableDocument:
+    def __init__(self, text='', png=True, svg=True, **svg_options):
+        """
+        A document that keeps the render results of each line, so that
+        an edit only re-renders the lines that changed.
+
+        :param text: Text with syllables separated by spaces and lines
+            separated by newlines
+        :param png: If True, keep a PNG image up to date in `image`
+        :param svg: If True, keep an SVG tree up to date in `svg`
+        :param svg_options: `merge` and `precision`, see `svg.write.Text`
+        """
+
+        self.png = png
+        self.svg_options = svg_options
+        self.lines = []
+        self.columns = []  # number of syllables in each line
+        self.image = None
+        self.svg = svg_write.SVG(0, 0, 0, 0) if svg else None
+        self.update(text)
+
+    def update(self, text):
+        """
+        Change the text of this document. Lines that did not change
+        keep their render results.
+
+        :param text: The new text
+        :return: The number of lines that were re-rendered
+        """
+
+        old_lines, lines = self.lines, text.split('\n')
+
+        # find the lines that changed, between an unchanged start and end
+        start = 0
+        while (start < min(len(old_lines), len(lines))
+               and old_lines[start] == lines[start]):
+            start += 1
+        end = 0
+        while (end < min(len(old_lines), len(lines)) - start
+               and old_lines[-end - 1] == lines[-end - 1]):
+            end += 1
+        old_stop, stop = len(old_lines) - end, len(lines) - end
+
+        tokens = tokenize('\n'.join(lines[start:stop])) if stop > start else []
+        self.lines = lines
+        self.columns[start:old_stop] = [len(line) for line in tokens]
+        if self.png:
+            self.update_image(tokens, start, old_stop, stop)
+        if self.svg is not None:
+            self.update_svg(tokens, start, old_stop, stop)
+        return stop - start
+
+    def update_image(self, tokens, start, old_stop, stop):
+        """Re-render lines `start` to `stop` and patch them in."""
+        line_height = png_alphabet.syllable_height
+        width = max(self.columns) * png_alphabet.syllable_width
+        height = len(self.lines) * line_height
+        new_images = [png_write.create_text([line]) for line in tokens]
+
+        old_image = self.image
+        if old_image is None or old_image.size != (width, height):
+            # the layout changed, so move the unchanged lines
+            self.image = Image.new(
+                'RGBA', (width, height), (255, 255, 255, 255))
+            if old_image is not None:
+                old_width = min(width, old_image.width)
+                self.image.paste(old_image.crop(
+                    (0, 0, old_width, start * line_height)))
+                self.image.paste(
+                    old_image.crop(
+                        (0, old_stop * line_height,
+                         old_width, old_image.height)),
+                    (0, stop * line_height))
+        for row, line_image in enumerate(new_images, start):
+            self.image.paste(
+                (255, 255, 255, 255),
+                (0, row * line_height, width, (row + 1) * line_height))
+            self.image.paste(line_image, (0, row * line_height))
+
+    def update_svg(self, tokens, start, old_stop, stop):
+        """Re-create lines `start` to `stop` and patch them in."""
+        size = svg_write.syllable_size
+        self.svg[start:old_stop] = [
+            self.create_svg_line(line) for line in tokens]
+        if old_stop != stop:
+            # the lines after the edit moved
+            for row in range(stop, len(self.svg)):
+                self.svg[row].set('transform', f'translate(0 {row * size})')
+        for row in range(start, stop):
+            self.svg[row].set('transform', f'translate(0 {row * size})')
+        self.svg.set(
+            'viewBox',
+            f'0 0 {max(self.columns) * size} {len(self.lines) * size}')
+
+    def create_svg_line(self, line):
+        """Create the SVG element of one line, drawn at the top."""
+        g = ElementTree.Element('g')
+        g.append(svg_write.create_line_element(line, **self.svg_options))
+        return g
+
+
+if __name__ == '__main__':
+    import os
+    if not os.path.isdir('tests'):
+        os.mkdir('tests')
+
+    anthem = (
+        "ju 'ar so swit\n"
+        "dan sin tu da bit\n"
+        "derz 'a mit mar kit\n"
+        "dawn da stit\n"
+        "da bojz 'and da gilz\n"
+        "wats its 'o der it")
+    Document(anthem).render(
+        PNGBackend('tests/anthem.png'),
+        SVGBackend('tests/anthem.svg'),
+        MetricsBackend())
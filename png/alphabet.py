@@ -1,8 +1,15 @@
+import os
+
 from PIL import Image
 
+from . import bundle
 
-img_consonants = 'consonants.png'
-img_vowels = 'vowels.png'
+directory = os.path.dirname(os.path.abspath(__file__))
+img_consonants = os.path.join(directory, 'consonants.png')
+img_vowels = os.path.join(directory, 'vowels.png')
+bundle_filename = os.path.join(directory, 'glyphs.bundle')
+# files that change the contents of the bundle
+bundle_sources = [img_consonants, img_vowels, os.path.abspath(__file__)]
 consonant_order = [
     'p', 'b', 'm', 'f', 'v',
     't', 'd', 'n', 's', 'z',
@@ -17,6 +24,9 @@ c_box_width = 11
 c_box_height = 15
 v_box_width = 33
 v_box_height = 33
+# boxes are cropped by 1 pixel on each side
+syllable_width = v_box_width - 2
+syllable_height = v_box_height - 2
 
 
 def get_images(image, characters, box_width, box_height, transparent=True):
@@ -47,9 +57,48 @@ def color_to_alpha(image, color=(255, 255, 255)):
     return img
 
 
+def decode_images():
+    """
+    Cut the glyph images out of the glyph sheets.
+
+    :return: A dict with 'consonants' and 'vowels', each a dict of
+        character to Image
+    """
+
+    return {
+        'consonants': get_images(
+            img_consonants, consonant_order, c_box_width, c_box_height),
+        'vowels': get_images(
+            img_vowels, vowel_order, v_box_width, v_box_height,
+            transparent=False)}
+
+
+def load_images():
+    """
+    Load the glyph images from the precompiled bundle, or from the glyph
+    sheets if the bundle is missing or stale.
+
+    :return: See `decode_images`
+    """
+
+    images = bundle.read_bundle(
+        bundle_filename, bundle_sources,
+        {'consonants': consonant_order, 'vowels': vowel_order})
+    if images is None:
+        images = decode_images()
+    return images
+
+
+def build_bundle():
+    """Compile the glyph sheets into the bundle."""
+    bundle.write_bundle(bundle_filename, decode_images(), bundle_sources)
+
+
+glyph_images = load_images()
+
+
 class Consonant:
-    consonant_images = get_images(
-        img_consonants, consonant_order, c_box_width, c_box_height)
+    consonant_images = glyph_images['consonants']
 
     def __init__(self, char,
                  end_char=False, descends=True, tall=True, wide=True):
@@ -72,8 +121,7 @@ class Consonant:
 
 
 class Vowel:
-    vowel_images = get_images(
-        img_vowels, vowel_order, v_box_width, v_box_height, transparent=False)
+    vowel_images = glyph_images['vowels']
 
     def __init__(
             self, char,
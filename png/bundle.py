@@ -0,0 +1,129 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+
+from PIL import Image
+
+magic = b'ALPHGLY1'
+
+
+def source_hashes(sources):
+    """
+    Hash the files a bundle was built from.
+
+    :param sources: A list of file paths
+    :return: A dict of file name to CRC-32 checksum
+    """
+
+    hashes = {}
+    for source in sources:
+        with open(source, 'rb') as f:
+            hashes[os.path.basename(source)] = zlib.crc32(f.read())
+    return hashes
+
+
+def write_bundle(filename, groups, sources):
+    """
+    Write glyph images to a bundle of raw pixels.
+
+    :param filename: Path of the bundle to write
+    :param groups: A dict of group name to a dict of character to Image
+    :param sources: The files the images were made from, so that a
+        stale bundle can be detected
+    """
+
+    index = []
+    data = []
+    offset = 0
+    for group, images in groups.items():
+        for char, image in images.items():
+            raw = image.tobytes()
+            index.append(
+                (group, char, image.mode, *image.size, offset, len(raw)))
+            data.append(raw)
+            offset += len(raw)
+    header = json.dumps({
+        'sources': source_hashes(sources),
+        'glyphs': index}).encode('utf-8')
+    # written next to the bundle and moved into place, so that a process
+    # starting meanwhile never maps a partly written bundle
+    fd, temp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)), prefix='.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(magic)
+            f.write(struct.pack('>I', len(header)))
+            f.write(header)
+            f.writelines(data)
+        os.chmod(temp, 0o644)  # mkstemp makes files private
+        os.replace(temp, filename)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def read_bundle(filename, sources, glyphs=None):
+    """
+    Map a bundle into memory. The images share the mapped pixels
+    instead of decoding or copying them.
+
+    :param filename: Path of the bundle
+    :param sources: The files the images should have been made from
+    :param glyphs: A dict of group name to the characters the bundle
+        must have, or None to accept any glyphs
+    :return: A dict of group name to a dict of character to Image, or
+        None if the bundle is missing, invalid, incomplete or older than
+        `sources`
+    """
+
+    try:
+        with open(filename, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        groups = map_glyphs(buffer, sources)
+    except (ValueError, KeyError, TypeError, struct.error):
+        # a truncated or corrupt bundle (json errors are ValueErrors)
+        return None
+    if groups is not None and glyphs is not None:
+        for group, chars in glyphs.items():
+            if not set(chars) <= groups.get(group, {}).keys():
+                return None
+    return groups
+
+
+def map_glyphs(buffer, sources):
+    """
+    Create the images of a mapped bundle. See `read_bundle`.
+
+    :raise ValueError: If the bundle is truncated or its header is
+        invalid
+    """
+
+    if buffer[:len(magic)] != magic:
+        return None
+    start = len(magic) + 4
+    header_length, = struct.unpack('>I', buffer[len(magic):start])
+    header = json.loads(buffer[start:start + header_length])
+    if header['sources'] != source_hashes(sources):
+        return None
+
+    data = memoryview(buffer)[start + header_length:]
+    groups = {}
+    for group, char, mode, width, height, offset, length in header[
+            'glyphs']:
+        if offset < 0 or offset + length > len(data):
+            raise ValueError(f'Bundle is truncated at glyph {char!r}')
+        groups.setdefault(group, {})[char] = Image.frombuffer(
+            mode, (width, height), data[offset:offset + length],
+            'raw', mode, 0, 1)
+    return groups
+
+
+if __name__ == '__main__':
+    from . import alphabet
+    alphabet.build_bundle()
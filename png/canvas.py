@@ -0,0 +1,166 @@
+import mmap
+import struct
+import zlib
+
+from . import alphabet
+from .write import create_syllable, parse_syllable
+
+
+class MappedCanvas:
+    def __init__(self, filename, width, height,
+                 color=(255, 255, 255, 255)):
+        """
+        An RGBA canvas stored in a memory-mapped raw pixel file instead
+        of in memory, so its size is limited by disk rather than RAM.
+        The file is left behind as raw RGBA output when the canvas is
+        closed.
+
+        :param filename: Path of the raw pixel file to create
+        :param width: Width of the canvas in pixels
+        :param height: Height of the canvas in pixels
+        :param color: RGBA color to fill the canvas with
+        """
+
+        self.width = width
+        self.height = height
+        self.stride = width * 4  # bytes per row
+        self.file = open(filename, 'w+b')
+        self.file.truncate(self.stride * height)
+        self.buffer = mmap.mmap(self.file.fileno(), self.stride * height)
+        row = bytes(color) * width
+        for y in range(height):
+            self.buffer[y * self.stride:(y + 1) * self.stride] = row
+            if y % 256 == 255:
+                self.release(y - 255, y + 1)
+        self.release(0, height)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def release(self, top, bottom):
+        """
+        Let the operating system drop the pages of rows `top` to
+        `bottom` from memory. They are kept in the file and are read
+        back in if they are used again.
+        """
+
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        start = (top * self.stride) // mmap.PAGESIZE * mmap.PAGESIZE
+        end = bottom * self.stride
+        if end > start:
+            self.buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def paste(self, image, box):
+        """
+        Copy an image onto the canvas, replacing the pixels under it.
+        Like `Image.paste`, the parts outside the canvas are left out.
+
+        :param image: An Image
+        :param box: 2-tuple of (x, y) position to paste the image
+        """
+
+        x, y = box
+        # the part of the image that is on the canvas
+        left, top = max(0, -x), max(0, -y)
+        right = min(image.width, self.width - x)
+        bottom = min(image.height, self.height - y)
+        if right <= left or bottom <= top:
+            return
+        if (left, top, right, bottom) != (0, 0, *image.size):
+            image = image.crop((left, top, right, bottom))
+            x, y = x + left, y + top
+        image = image.convert('RGBA')
+        data = image.tobytes()
+        image_stride = image.width * 4
+        for row in range(image.height):
+            start = (y + row) * self.stride + x * 4
+            self.buffer[start:start + image_stride] = data[
+                row * image_stride:(row + 1) * image_stride]
+
+    def save(self, filename, chunk_rows=256):
+        """
+        Encode the canvas as a PNG file, a few rows at a time.
+
+        :param filename: Path of the PNG file to write
+        :param chunk_rows: Number of rows to compress at once
+        """
+
+        compressor = zlib.compressobj()
+        with open(filename, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            # 8 bits per channel, RGBA, no interlacing
+            write_chunk(f, b'IHDR', struct.pack(
+                '>IIBBBBB', self.width, self.height, 8, 6, 0, 0, 0))
+            for top in range(0, self.height, chunk_rows):
+                rows = range(top, min(top + chunk_rows, self.height))
+                # each row starts with filter type 0 (none)
+                data = b''.join(
+                    b'\x00' + self.buffer[
+                        y * self.stride:(y + 1) * self.stride]
+                    for y in rows)
+                compressed = compressor.compress(data)
+                if compressed:
+                    write_chunk(f, b'IDAT', compressed)
+                self.release(top, rows.stop)
+            write_chunk(f, b'IDAT', compressor.flush())
+            write_chunk(f, b'IEND', b'')
+
+
+def write_chunk(f, chunk_type, data):
+    f.write(struct.pack('>I', len(data)))
+    f.write(chunk_type)
+    f.write(data)
+    f.write(struct.pack('>I', zlib.crc32(chunk_type + data)))
+
+
+def transcribe(text, filename, buffer_filename):
+    """
+    Transcribe a text through a memory-mapped canvas, so that only a
+    few rows of pixels are in memory at a time.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :param filename: Path of the PNG file to write, or None to only
+        write the raw RGBA pixels
+    :param buffer_filename: Path of the raw RGBA pixel file
+    """
+
+    lines = text.split('\n')
+    columns = max(len(line.split(' ')) for line in lines)
+    width = columns * alphabet.syllable_width
+    height = len(lines) * alphabet.syllable_height
+    with MappedCanvas(buffer_filename, width, height) as canvas:
+        for row, line in enumerate(lines):
+            for column, syllable in enumerate(line.split(' ')):
+                canvas.paste(
+                    create_syllable(*parse_syllable(syllable)),
+                    (column * alphabet.syllable_width,
+                     row * alphabet.syllable_height))
+            canvas.release(
+                row * alphabet.syllable_height,
+                (row + 1) * alphabet.syllable_height)
+        if filename:
+            canvas.save(filename)
+
+
+if __name__ == '__main__':
+    import os
+    if not os.path.isdir('tests'):
+        os.mkdir('tests')
+
+    anthem = (
+        "ju 'ar so swit\n"
+        "dan sin tu da bit\n"
+        "derz 'a mit mar kit\n"
+        "dawn da stit\n"
+        "da bojz 'and da gilz\n"
+        "wats its 'o der it")
+    transcribe(anthem, 'tests/anthem.png', 'tests/anthem.rgba')
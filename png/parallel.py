@@ -0,0 +1,109 @@
+import math
+import os
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from PIL import Image
+
+from . import alphabet
+from .write import create_text, parse_syllable
+
+
+def render_band(band, name, width, scale):
+    """
+    Render some lines into their band of a shared canvas.
+
+    :param band: A tuple of (first row, list of line strings)
+    :param name: Name of the shared memory block of the canvas
+    :param width: Width of the canvas in pixels
+    :param scale: An integer scale factor
+    """
+
+    first_row, lines = band
+    syllable_height = alphabet.syllable_height * scale
+    lines = [
+        [parse_syllable(syllable) for syllable in line.split(' ')]
+        for line in lines]
+    image = create_text(lines, scale)
+    if image.width < width:
+        # the lines of this band are shorter than the longest line
+        band_image = Image.new(
+            'RGBA', (width, image.height), (255, 255, 255, 255))
+        band_image.paste(image)
+        image = band_image
+
+    shared = SharedMemory(name)
+    try:
+        start = first_row * syllable_height * width * 4
+        data = image.tobytes()
+        shared.buf[start:start + len(data)] = data
+    finally:
+        shared.close()
+
+
+def transcribe(text, filename, scale=1, workers=None, band_rows=None):
+    """
+    Transcribe a text using several processes. The canvas is in shared
+    memory, each process draws whole lines straight into it, and only
+    the finished canvas is encoded here.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :param filename: Path of the file, or a writable binary file object
+    :param scale: An integer scale factor
+    :param workers: Number of worker processes, or None for one per CPU
+    :param band_rows: Number of lines drawn by each task. If None, each
+        process gets about four bands, to even out uneven lines.
+    """
+
+    lines = text.split('\n')
+    columns = max(line.count(' ') + 1 for line in lines)
+    width = columns * alphabet.syllable_width * scale
+    height = len(lines) * alphabet.syllable_height * scale
+
+    if workers is None:
+        workers = os.cpu_count()
+    if band_rows is None:
+        band_rows = math.ceil(len(lines) / (workers * 4))
+    bands = [
+        (row, lines[row:row + band_rows])
+        for row in range(0, len(lines), band_rows)]
+    # created before the workers, so that they share this process's
+    # resource tracker instead of each cleaning it up on exit
+    shared = SharedMemory(create=True, size=width * height * 4)
+    image = None
+    try:
+        with Pool(workers) as pool:
+            pool.map(
+                partial(render_band, name=shared.name, width=width,
+                        scale=scale),
+                bands, chunksize=1)
+        image = Image.frombuffer(
+            'RGBA', (width, height), shared.buf, 'raw', 'RGBA', 0, 1)
+        image.save(filename, 'PNG' if hasattr(filename, 'write') else None)
+    finally:
+        # the image holds on to the buffer, which can't be closed until
+        # the image is gone
+        image = None
+        try:
+            shared.close()
+        except BufferError:
+            # the traceback of an error in save() still refers to the
+            # image. The memory is freed once that is gone too.
+            pass
+        shared.unlink()
+
+
+if __name__ == '__main__':
+    if not os.path.isdir('tests'):
+        os.mkdir('tests')
+
+    anthem = (
+        "ju 'ar so swit\n"
+        "dan sin tu da bit\n"
+        "derz 'a mit mar kit\n"
+        "dawn da stit\n"
+        "da bojz 'and da gilz\n"
+        "wats its 'o der it")
+    transcribe('\n'.join([anthem] * 1000), 'tests/anthem_book.png')
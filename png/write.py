@@ -1,24 +1,67 @@
+import io
 import math
+from functools import lru_cache
 
-from PIL import Image
+from PIL import Image, ImageChops
 
 from . import alphabet
 
+syllable_cache_size = 4096  # syllable images kept by `cached_syllable`
+
+
+@lru_cache(maxsize=None)
+def mono_images():
+    """
+    Get the glyph images in mode '1', black on white.
+
+    :return: See `alphabet.decode_images`
+    """
+
+    images = {}
+    for group, glyphs in alphabet.glyph_images.items():
+        images[group] = {}
+        for char, image in glyphs.items():
+            white = Image.new('RGBA', image.size, (255, 255, 255, 255))
+            gray = Image.alpha_composite(white, image.convert('RGBA'))
+            images[group][char] = gray.convert('L').point(
+                lambda value: 255 if value >= 128 else 0, '1')
+    return images
+
+
+def overlay(image, ink, box):
+    """
+    Draw the black pixels of `ink` onto `image`, both in mode '1'.
+
+    :param image: An Image to draw on
+    :param ink: An Image to draw
+    :param box: A tuple starting with the (x, y) position to draw at
+    """
+
+    x, y = box[:2]
+    region = image.crop((x, y, x + ink.width, y + ink.height))
+    image.paste(ImageChops.logical_and(region, ink), (x, y))
+
 
 def create_line(chars, onset=True, transpose=None, overlap=1,
                 width=alphabet.vowel_line_length,
-                height=alphabet.character_height):
+                height=alphabet.character_height, mono=False):
     if len(chars) > 2:
         raise ValueError(
             'Consonant clusters cannot be longer than 2 characters')
-    line_img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    if mono:
+        line_img = Image.new('1', (width, height), 1)
+    else:
+        line_img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
     x = 0 if onset else width
     y = 0
     if not onset:
-        chars.reverse()  # going to place chars in reverse order
+        chars = chars[::-1]  # going to place chars in reverse order
     for char in chars:
         consonant = alphabet.consonants[char]
-        char_img = consonant.image
+        if mono:
+            char_img = mono_images()['consonants'][char]
+        else:
+            char_img = consonant.image
         char_width, char_height = char_img.size
         if len(chars) == 1 and not consonant.end_char:
             # center the character
@@ -30,36 +73,67 @@ def create_line(chars, onset=True, transpose=None, overlap=1,
             # (x1, y1, x2, y2)
             box = (x - char_width, y, x, height)
             x -= char_width - overlap
-        line_img.paste(char_img, box, char_img)
+        if mono:
+            overlay(line_img, char_img, box)
+        else:
+            line_img.paste(char_img, box, char_img)
     if transpose:
         line_img = line_img.transpose(transpose)
     return line_img
 
 
-def create_syllable(onset, nucleus, coda):
+def create_syllable(onset, nucleus, coda, scale=1, mono=False):
     """
     Create a syllable image.
 
     :param onset: A list of consonant strings
     :param nucleus: A vowel string
     :param coda: A list of coda strings
+    :param scale: An integer scale factor
+    :param mono: If True, create a black and white image in mode '1'
+        instead of RGBA
     :return: An Image
     """
 
     # TODO if the last character in onset or first in coda descends, and
     #  the opposite side has one character, shift the single character
     vowel = alphabet.vowels[nucleus]
-    syllable_img = vowel.image.copy()
+    if mono:
+        syllable_img = mono_images()['vowels'][nucleus].copy()
+    else:
+        syllable_img = vowel.image.copy()
 
-    onset_img = create_line(onset, onset=True, transpose=vowel.onset_transpose)
-    coda_img = create_line(coda, onset=False, transpose=vowel.coda_transpose)
+    onset_img = create_line(
+        onset, onset=True, transpose=vowel.onset_transpose, mono=mono)
+    coda_img = create_line(
+        coda, onset=False, transpose=vowel.coda_transpose, mono=mono)
 
-    syllable_img.paste(onset_img, vowel.onset_pos, onset_img)
-    syllable_img.paste(coda_img, vowel.coda_pos, coda_img)
+    if mono:
+        overlay(syllable_img, onset_img, vowel.onset_pos)
+        overlay(syllable_img, coda_img, vowel.coda_pos)
+    else:
+        syllable_img.paste(onset_img, vowel.onset_pos, onset_img)
+        syllable_img.paste(coda_img, vowel.coda_pos, coda_img)
 
+    if scale != 1:
+        # scaling the finished syllable gives the same pixels as
+        # drawing it with scaled glyphs, with less work
+        syllable_img = syllable_img.resize(
+            (syllable_img.width * scale, syllable_img.height * scale),
+            Image.NEAREST)
     return syllable_img
 
 
+@lru_cache(maxsize=syllable_cache_size)
+def cached_syllable(onset, nucleus, coda, scale=1, mono=False):
+    """
+    Like `create_syllable`, but the most recently used syllable images
+    are kept. The images are shared, so they must not be modified.
+    """
+
+    return create_syllable(onset, nucleus, coda, scale, mono)
+
+
 def concat_images(im1, im2, vertical=False):
     if im1 is None:
         return im2
@@ -78,7 +152,57 @@ def concat_images(im1, im2, vertical=False):
     return new_image
 
 
-def transcribe_syllable(text):
+def create_text(lines, scale=1, mono=False):
+    """
+    Create an image of a whole text on a single canvas. Each distinct
+    line is only drawn once.
+
+    :param lines: A list of lines, each a list of
+        (onset, nucleus, coda) tuples
+    :param scale: An integer scale factor
+    :param mono: See `create_syllable`
+    :return: An Image
+    """
+
+    syllable_width = alphabet.syllable_width * scale
+    syllable_height = alphabet.syllable_height * scale
+    width = max(len(line) for line in lines) * syllable_width
+    height = len(lines) * syllable_height
+    if mono:
+        image = Image.new('1', (width, height), 1)
+    else:
+        image = Image.new('RGBA', (width, height), (255, 255, 255, 255))
+    first_rows = {}  # row where each distinct line was first drawn
+    for row, line in enumerate(lines):
+        # hashable, for the caches
+        line = tuple(
+            (tuple(onset), nucleus, tuple(coda))
+            for onset, nucleus, coda in line)
+        if line in first_rows:
+            # copy a repeated line instead of drawing it again
+            top = first_rows[line] * syllable_height
+            image.paste(
+                image.crop((0, top, len(line) * syllable_width,
+                            top + syllable_height)),
+                (0, row * syllable_height))
+            continue
+        first_rows[line] = row
+        for column, syllable in enumerate(line):
+            image.paste(
+                cached_syllable(*syllable, scale, mono),
+                (column * syllable_width, row * syllable_height))
+    return image
+
+
+def parse_syllable(text):
+    """
+    Split a syllable string into its parts.
+
+    :param text: Syllable string
+    :return: A tuple of (onset, nucleus, coda), where onset and coda
+        are tuples of consonant strings
+    """
+
     onset, nucleus, coda = [], '', []
     i = 0
     while i < len(text):
@@ -87,7 +211,7 @@ def transcribe_syllable(text):
             nucleus = char
             i += 1
             continue
-        elif char == 'g' and text[i+1] == 'h':
+        elif char == 'g' and text[i+1:i+2] == 'h':
             char += 'h'
             i += 1
 
@@ -96,21 +220,80 @@ def transcribe_syllable(text):
         else:
             onset.append(char)
         i += 1
-    return create_syllable(onset, nucleus, coda)
+    return tuple(onset), nucleus, tuple(coda)
+
 
+def transcribe_syllable(text, scale=1):
+    return create_syllable(*parse_syllable(text), scale=scale)
 
-def transcribe_line(text):
+
+def transcribe_line(text, scale=1):
     image = None
     for syllable in text.split(' '):
-        image = concat_images(image, transcribe_syllable(syllable))
+        image = concat_images(image, transcribe_syllable(syllable, scale))
     return image
 
 
-def transcribe(text, filename):
-    image = None
-    for line in text.split('\n'):
-        image = concat_images(image, transcribe_line(line), vertical=True)
-    image.save(filename)
+def render(text, scale=1, mono=False):
+    """
+    Transcribe a text into an image, without writing it anywhere.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :param scale: An integer scale factor
+    :param mono: See `create_syllable`
+    :return: An Image
+    """
+
+    lines = [
+        [parse_syllable(syllable) for syllable in line.split(' ')]
+        for line in text.split('\n')]
+    return create_text(lines, scale, mono)
+
+
+def to_bytes(text, scale=1, format='PNG', mono=False):
+    """
+    Transcribe a text into encoded image bytes.
+
+    :return: A bytes object
+    """
+
+    f = io.BytesIO()
+    render(text, scale, mono).save(f, format)
+    return f.getvalue()
+
+
+def to_raw(text, scale=1, mono=False):
+    """
+    Transcribe a text into raw pixels, for callers that encode or send
+    the pixels themselves. The pixels are RGBA, or packed 1 bit per
+    pixel rows if `mono` is True.
+
+    Pillow does not expose the memory of an image, so the pixels are
+    copied out of it once. The memoryview is over that copy, and slicing
+    it copies nothing more. Use `render` to keep the Image instead.
+
+    :return: A tuple of (memoryview, (width, height))
+    """
+
+    image = render(text, scale, mono)
+    return memoryview(image.tobytes()), image.size
+
+
+def transcribe(text, filename, scale=1, format=None, mono=False):
+    """
+    Transcribe a text into an image file.
+
+    :param filename: Path of the file, or a writable binary file object
+    :param scale: An integer scale factor
+    :param format: Image format. If None, it comes from the file name,
+        or is PNG for file objects.
+    :param mono: If True, write a 1-bit black and white image
+    """
+
+    if format is None and hasattr(filename, 'write'):
+        format = 'PNG'
+    render(text, scale, mono).save(filename, format)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,115 @@
+import json
+import time
+from collections import Counter
+
+from pipeline import syllable_name, tokenize
+from png import write as png_write
+from svg import write as svg_write
+
+
+def syllable_profile(text):
+    """
+    Count the syllables of a corpus.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :return: A Counter of (onset, nucleus, coda) tuples
+    """
+
+    return Counter(syllable for line in tokenize(text) for syllable in line)
+
+
+def write_profile(text, filename):
+    """
+    Write the syllable frequencies of a corpus to a JSON file, as an
+    object of syllable text to count, most common first.
+
+    :param text: See `syllable_profile`
+    :param filename: Path of the JSON file
+    """
+
+    profile = syllable_profile(text)
+    with open(filename, 'w') as f:
+        json.dump({
+            syllable_name(syllable): count
+            for syllable, count in profile.most_common()}, f, indent=0)
+
+
+def read_profile(filename):
+    """
+    Read a profile written by `write_profile`.
+
+    :return: A list of (onset, nucleus, coda) tuples, most common first
+    """
+
+    with open(filename) as f:
+        return [png_write.parse_syllable(name) for name in json.load(f)]
+
+
+def prewarm(syllables, top=None, milliseconds=None, max_bytes=None,
+            scale=1, mono=False, png=True, svg=True):
+    """
+    Fill the syllable caches of `png.write` and `svg.write`, so that the
+    first renders after startup are as fast as later ones. Syllables are
+    rendered in order until `top` are done or a budget runs out, and
+    never more than fit in the caches.
+
+    :param syllables: A list of (onset, nucleus, coda) tuples, most
+        important first, like the result of `read_profile`
+    :param top: Largest number of syllables to render, or None
+    :param milliseconds: Time budget, or None
+    :param max_bytes: Budget for the memory of the cached syllables
+        (pixels of the PNG images and size of the pickled SVG shapes),
+        or None
+    :param scale: PNG scale factor to render the syllables at
+    :param mono: See `png.write.create_syllable`
+    :param png: If True, fill the `png.write` cache
+    :param svg: If True, fill the `svg.write` cache
+    :return: A dict of the number of 'syllables' rendered, the
+        'milliseconds' it took and the 'bytes' cached
+    """
+
+    limit = min(png_write.syllable_cache_size, svg_write.syllable_cache_size)
+    if top is not None:
+        limit = min(limit, top)
+    start = time.perf_counter()
+    count = size = 0
+    for onset, nucleus, coda in syllables[:limit]:
+        # hashable, for the caches
+        syllable = tuple(onset), nucleus, tuple(coda)
+        if (milliseconds is not None
+                and (time.perf_counter() - start) * 1000 >= milliseconds):
+            break
+        if max_bytes is not None and size >= max_bytes:
+            break
+        if png:
+            image = png_write.cached_syllable(*syllable, scale, mono)
+            size += image.width * image.height * len(image.getbands())
+        if svg:
+            size += len(svg_write.pickled_syllable(*syllable))
+        count += 1
+    return {
+        'syllables': count,
+        'milliseconds': (time.perf_counter() - start) * 1000,
+        'bytes': size}
+
+
+def prewarm_from_file(filename, **kwargs):
+    """
+    Fill the syllable caches from a profile file.
+
+    :param filename: Path of a profile written by `write_profile`
+    :param kwargs: See `prewarm`
+    :return: See `prewarm`
+    """
+
+    return prewarm(read_profile(filename), **kwargs)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit('usage: python prewarm.py CORPUS PROFILE')
+    with open(sys.argv[1]) as f:
+        write_profile(f.read(), sys.argv[2])
@@ -0,0 +1,209 @@
+import math
+
+from PIL import Image, ImageDraw
+
+from .shapes import Group
+from .write import syllable_size, transcribe_line, transcribe_syllable
+
+
+def rasterize(shape, width, height, scale=1, stroke_width=1,
+              color=(0, 0, 0, 255), background=(255, 255, 255, 255)):
+    """
+    Draw the strokes of a shape straight into an image.
+
+    :param shape: A Shape
+    :param width: Width of the area to draw, in SVG units
+    :param height: Height of the area to draw, in SVG units
+    :param scale: Pixels per SVG unit
+    :param stroke_width: Width of the strokes, in SVG units
+    :param color: RGBA color of the strokes
+    :param background: RGBA color of the background
+    :return: An Image
+    """
+
+    image = Image.new(
+        'RGBA', (round(width * scale), round(height * scale)), background)
+    draw_strokes(image, shape, scale, stroke_width, color)
+    return image
+
+
+def draw_strokes(image, shape, scale=1, stroke_width=1,
+                 color=(0, 0, 0, 255)):
+    """
+    Draw the strokes of a shape onto an existing image.
+
+    :param image: An Image to draw on
+    :param shape: A Shape
+    :param scale: Pixels per SVG unit
+    :param stroke_width: Width of the strokes, in SVG units
+    :param color: Color of the strokes
+    """
+
+    draw = ImageDraw.Draw(image)
+    line_width = max(1, round(stroke_width * scale))
+    for points in flatten(shape.path_commands()):
+        points = [(x * scale, y * scale) for x, y in points]
+        if len(points) == 1:
+            draw.point(points, fill=color)
+        else:
+            draw.line(points, fill=color, width=line_width, joint='curve')
+
+
+def rasterize_syllable(string, scale=1, **kwargs):
+    """
+    Draw a syllable into an image.
+
+    :param string: Syllable string
+    :param scale: Pixels per SVG unit
+    :param kwargs: Other arguments for `rasterize`
+    :return: An Image
+    """
+
+    return rasterize(
+        transcribe_syllable(string), syllable_size, syllable_size,
+        scale=scale, **kwargs)
+
+
+def rasterize_text(text, scale=1, **kwargs):
+    """
+    Draw a whole text into an image, with one row of syllables per line.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :param scale: Pixels per SVG unit
+    :param kwargs: Other arguments for `rasterize`
+    :return: An Image
+    """
+
+    lines = [
+        transcribe_line(line, y)
+        for y, line in enumerate(text.split('\n'))]
+    width = max(len(line.items) for line in lines) * syllable_size
+    height = len(lines) * syllable_size
+    return rasterize(
+        Group(*lines), width, height, scale=scale, **kwargs)
+
+
+def flatten(commands, arc_step=math.pi / 16):
+    """
+    Turn path commands into lists of points, one list per subpath.
+    Arcs are approximated with straight segments.
+
+    :param commands: A list of tuples of the form (command, *args)
+    :param arc_step: Largest angle, in radians, covered by one segment
+        of an arc
+    :return: A list of lists of (x, y) points
+    """
+
+    subpaths = []
+    points = []
+    x, y = 0, 0
+    for command in commands:
+        c, *args = command
+        relative = c.islower()
+        c = c.upper()
+        if c == 'M':
+            if len(points) > 0:
+                subpaths.append(points)
+            x, y = (x + args[0], y + args[1]) if relative else args[:2]
+            points = [(x, y)]
+            continue
+        elif c == 'L':
+            x, y = (x + args[0], y + args[1]) if relative else args[:2]
+        elif c == 'H':
+            x = x + args[0] if relative else args[0]
+        elif c == 'V':
+            y = y + args[0] if relative else args[0]
+        elif c == 'Z':
+            if points:
+                x, y = points[0]
+        elif c == 'A':
+            rx, ry, rotation, large_arc, sweep, end_x, end_y = args
+            if relative:
+                end_x, end_y = x + end_x, y + end_y
+            points.extend(arc_points(
+                (x, y), (end_x, end_y), rx, ry, rotation,
+                large_arc, sweep, arc_step))
+            x, y = end_x, end_y
+            continue
+        else:
+            raise ValueError(f'Unsupported path command: {command[0]!r}')
+        points.append((x, y))
+    if len(points) > 0:
+        subpaths.append(points)
+    return subpaths
+
+
+def arc_points(start, end, rx, ry, rotation, large_arc, sweep, arc_step):
+    """
+    Approximate an SVG elliptical arc with a list of points, not
+    including the start point.
+
+    :param start: (x, y) point where the arc starts
+    :param end: (x, y) point where the arc ends
+    :param rx: Horizontal radius
+    :param ry: Vertical radius
+    :param rotation: Rotation of the ellipse, in degrees
+    :param large_arc: If true, take the arc longer than 180 degrees
+    :param sweep: If true, draw the arc in the positive angle direction
+    :param arc_step: Largest angle, in radians, covered by one segment
+    :return: A list of (x, y) points
+    """
+
+    (x1, y1), (x2, y2) = start, end
+    if start == end:
+        return []
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return [end]
+
+    # convert from endpoint to center parameterization
+    # (SVG 1.1 implementation notes, F.6.5)
+    phi = math.radians(rotation)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    # scale up radii that are too small to reach the end point
+    radii_scale = (x1p ** 2) / (rx ** 2) + (y1p ** 2) / (ry ** 2)
+    if radii_scale > 1:
+        rx, ry = rx * math.sqrt(radii_scale), ry * math.sqrt(radii_scale)
+
+    numerator = (rx * ry) ** 2 - (rx * y1p) ** 2 - (ry * x1p) ** 2
+    denominator = (rx * y1p) ** 2 + (ry * x1p) ** 2
+    factor = math.sqrt(max(0, numerator / denominator))
+    if bool(large_arc) == bool(sweep):
+        factor = -factor
+    cxp = factor * rx * y1p / ry
+    cyp = -factor * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    start_angle = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    end_angle = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    delta = end_angle - start_angle
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+
+    segments = max(1, math.ceil(abs(delta) / arc_step))
+    points = []
+    for i in range(1, segments + 1):
+        angle = start_angle + delta * i / segments
+        x = rx * math.cos(angle)
+        y = ry * math.sin(angle)
+        points.append((
+            cos_phi * x - sin_phi * y + cx,
+            sin_phi * x + cos_phi * y + cy))
+    points[-1] = end
+    return points
+
+
+if __name__ == '__main__':
+    import os
+    if not os.path.isdir('tests'):
+        os.mkdir('tests')
+
+    rasterize_syllable('test', scale=10).save('tests/test.png')
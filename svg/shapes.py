@@ -9,7 +9,7 @@ class Shape(ABC):
         self.center = None
 
     @abstractmethod
-    def create_element(self):
+    def create_element(self, precision=None):
         pass
 
     @abstractmethod
@@ -37,6 +37,38 @@ class Shape(ABC):
     def translate(self, x, y):
         pass
 
+    @abstractmethod
+    def path_commands(self):
+        pass
+
+    def merge(self):
+        """
+        Combine the geometry of this shape into as few Path objects as
+        possible. Shapes with the same attributes are drawn by a single
+        Path, so the output looks the same with fewer elements.
+        This should be the last step before creating elements, since
+        Path does not know how to transform arc commands.
+
+        :return: A Path, or a Group of Paths if the attributes differ
+        """
+
+        merged = {}
+        for shape in self.leaves():
+            key = tuple(sorted(shape.attrib.items()))
+            merged.setdefault(key, []).extend(shape.path_commands())
+        paths = [
+            Path(*commands,
+                 center_x=self.center[0], center_y=self.center[1],
+                 **dict(key))
+            for key, commands in merged.items()]
+        if len(paths) == 1:
+            return paths[0]
+        return Group(*paths)
+
+    def leaves(self):
+        """Yield every shape that is not a Group."""
+        yield self
+
 
 class Polyline(Shape):
     def __init__(self, *points, center_x=None, center_y=None, **attrs):
@@ -71,9 +103,11 @@ class Polyline(Shape):
                 center_y = min_y + ((max_y - min_y) / 2)
         self.center = (center_x, center_y)
 
-    def create_element(self):
+    def create_element(self, precision=None):
         """
         Create an XML Element for this shape.
+        :param precision: Decimal places to round coordinates to, or
+            None to keep them as they are
         :return: An instance of xml.etree.ElementTree.Element
         """
 
@@ -82,7 +116,9 @@ class Polyline(Shape):
             attrib={
                 # 'x1,y1 x2,y2' instead of ((x1, y1), (x2, y2))
                 'points': ' '.join([
-                    ','.join((str(x), str(y)))
+                    ','.join((
+                        format_number(x, precision),
+                        format_number(y, precision)))
                     for x, y in self.points]),
                 **self.attrib})
 
@@ -149,6 +185,17 @@ class Polyline(Shape):
         center_x, center_y = self.center
         self.center = (center_x + x, center_y + y)
 
+    def path_commands(self):
+        """
+        Get the path commands that draw this shape.
+        :return: A list of tuples of the form (command, *args)
+        """
+
+        if not self.points:
+            return []
+        (start_x, start_y), *points = self.points
+        return [('M', start_x, start_y), *[('L', x, y) for x, y in points]]
+
 
 class Circle(Shape):
     def __init__(self, center_x, center_y, radius, **attrs):
@@ -166,18 +213,20 @@ class Circle(Shape):
         self.center = (center_x, center_y)
         self.attrib = {'fill': 'none', 'stroke': 'black', **attrs}
 
-    def create_element(self):
+    def create_element(self, precision=None):
         """
         Create an XML Element for this shape.
+        :param precision: Decimal places to round coordinates to, or
+            None to keep them as they are
         :return: An instance of xml.etree.ElementTree.Element
         """
 
         return ElementTree.Element(
             'circle',
             attrib={
-                'cx': str(self.center[0]),
-                'cy': str(self.center[1]),
-                'r': str(self.radius),
+                'cx': format_number(self.center[0], precision),
+                'cy': format_number(self.center[1], precision),
+                'r': format_number(self.radius, precision),
                 **self.attrib})
 
     def rotate(self, degrees, around_point=None):
@@ -226,6 +275,21 @@ class Circle(Shape):
         center_x, center_y = self.center
         self.center = (center_x + x, center_y + y)
 
+    def path_commands(self):
+        """
+        Get the path commands that draw this shape, as two half-circle
+        arcs.
+        :return: A list of tuples of the form (command, *args)
+        """
+
+        center_x, center_y = self.center
+        r = self.radius
+        return [
+            ('M', center_x - r, center_y),
+            ('A', r, r, 0, 1, 0, center_x + r, center_y),
+            ('A', r, r, 0, 1, 0, center_x - r, center_y),
+            ('Z',)]
+
 
 class Path(Shape):
     def __init__(self, *commands, center_x=None, center_y=None, **attrs):
@@ -288,20 +352,24 @@ class Path(Shape):
             min_x + ((max_x - min_x) / 2),
             min_y + ((max_y - min_y) / 2))
 
-    def create_element(self):
+    def create_element(self, precision=None):
         """
         Create an XML Element for this shape.
+        :param precision: Decimal places to round coordinates to, or
+            None to keep them as they are
         :return: An instance of xml.etree.ElementTree.Element
         """
 
         return ElementTree.Element(
             'path',
             attrib={
-                # 'M x1,y1 Lx2,y2' instead of (('M', x1, y1), ('L', x2, y2))
+                # 'M x1,y1 L x2,y2' instead of (('M', x1, y1), ('L', x2, y2))
                 'd': ' '.join(
-                    '{c} {coords}'.format(
-                        c=command[0],
-                        coords=','.join([str(c) for c in command[1:]]))
+                    ' '.join((
+                        command[0],
+                        ','.join([
+                            format_number(c, precision)
+                            for c in command[1:]]))).strip()
                     for command in self.commands),
                 **self.attrib})
 
@@ -333,10 +401,8 @@ class Path(Shape):
                     try:
                         y = command[2]
                     except IndexError:
-                        print('TEST1')
                         pass  # keep the previous y
                 except IndexError:
-                    print('test2')
                     pass  # keep the previous x
             point = (x, y)
             new_point = rotate_point(point, around_point, degrees)
@@ -362,6 +428,7 @@ class Path(Shape):
         # flip across the x value in all commands
         new_commands = []
         for command in self.commands:
+            command = list(command)
             c = command[0]
             if c.lower() == 'v':
                 # only has y value, don't alter command
@@ -393,11 +460,13 @@ class Path(Shape):
         # flip across the y value in all commands
         new_commands = []
         for command in self.commands:
+            command = list(command)
             c = command[0]
             if c.lower() == 'v':
                 # only has y value, flip
                 old_y = command[1]
                 command[1] = flip_coordinate(old_y, y)
+                new_commands.append(command)
             else:
                 try:
                     old_y = command[2]
@@ -434,6 +503,14 @@ class Path(Shape):
         center_x, center_y = self.center
         self.center = (center_x + x, center_y + y)
 
+    def path_commands(self):
+        """
+        Get the path commands that draw this shape.
+        :return: A list of tuples of the form (command, *args)
+        """
+
+        return [tuple(command) for command in self.commands]
+
 
 class Group(Shape):
     def __init__(self, *items):
@@ -445,6 +522,9 @@ class Group(Shape):
 
         super().__init__()
         self.items = items
+        if not items:
+            self.center = (0, 0)
+            return
 
         # set center to the average of each item's center
         x_centers = []
@@ -457,10 +537,10 @@ class Group(Shape):
             sum(x_centers) / len(x_centers),
             sum(y_centers) / len(y_centers))
 
-    def create_element(self):
+    def create_element(self, precision=None):
         g = ElementTree.Element('g')
         for item in self.items:
-            g.insert(1, item.create_element())
+            g.insert(1, item.create_element(precision))
         return g
 
     def rotate(self, degrees, around_point=None):
@@ -521,6 +601,22 @@ class Group(Shape):
         center_x, center_y = self.center
         self.center = (center_x + x, center_y + y)
 
+    def path_commands(self):
+        """
+        Get the path commands that draw every shape in this group.
+        :return: A list of tuples of the form (command, *args)
+        """
+
+        return [
+            command
+            for item in self.items
+            for command in item.path_commands()]
+
+    def leaves(self):
+        """Yield every shape in this group that is not a Group."""
+        for item in self.items:
+            yield from item.leaves()
+
 
 def flip_coordinate(coord_a, coord_b):
     """
@@ -535,6 +631,26 @@ def flip_coordinate(coord_a, coord_b):
     return coord_a + (2 * difference)
 
 
+def format_number(value, precision=None):
+    """
+    Format a coordinate for an SVG attribute, dropping trailing zeros.
+
+    :param value: an int or float
+    :param precision: Decimal places to round to, or None to keep the
+        value as it is
+    :return: A string
+    """
+
+    if precision is None:
+        return str(value)
+    string = f'{value:.{precision}f}'
+    if '.' in string:
+        string = string.rstrip('0').rstrip('.')
+    if string == '-0':
+        string = '0'
+    return string
+
+
 def rotate_point(point_a, point_b, degrees):
     """
     Rotate `point_a` around `point_b` and return the new coordinates of
@@ -1,8 +1,18 @@
+import gzip
+import pickle
+import zlib
 from copy import deepcopy
+from functools import lru_cache
 from xml.dom import minidom
 from xml.etree import ElementTree
 
-from alphabet import alphabet, Vowel
+from .alphabet import alphabet, Vowel
+from .shapes import Group
+
+ElementTree.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+
+syllable_size = 30
+syllable_cache_size = 4096  # syllables kept by `pickled_syllable`
 
 
 class SVG(ElementTree.Element):
@@ -12,15 +22,109 @@ class SVG(ElementTree.Element):
                 'viewBox': f'{x} {y} {width} {height}',
                 'xmlns': 'http://www.w3.org/2000/svg'})
 
-    def to_file(self, filename):
-        with open(filename, 'w') as f:
-            f.write(pformat(self))
+    def to_file(self, filename, pretty=True, compress=None):
+        """
+        Write this SVG to a file.
+
+        :param filename: Path of the file to write, or a writable binary
+            file object
+        :param pretty: If True, indent the output with tabs and newlines.
+            If False, write it without any whitespace.
+        :param compress: If True, gzip the output (svgz). If None,
+            compress only if `filename` ends with '.svgz'.
+        """
+
+        if hasattr(filename, 'write'):
+            if compress:
+                with gzip.GzipFile(fileobj=filename, mode='wb') as f:
+                    self.write(f, pretty)
+            else:
+                self.write(filename, pretty)
+            return
+
+        if compress is None:
+            compress = filename.endswith('.svgz')
+        if compress:
+            f = gzip.open(filename, 'wb')
+        else:
+            f = open(filename, 'wb')
+        with f:
+            self.write(f, pretty)
+
+    def write(self, f, pretty=True):
+        """Write this SVG to a binary file object."""
+        if pretty:
+            f.write(pformat(self).encode('utf-8'))
+        else:
+            # streams straight into the (compressed) file
+            ElementTree.ElementTree(self).write(
+                f, encoding='utf-8', xml_declaration=True)
+
+    def to_string(self, pretty=True):
+        """
+        Get this SVG as a string.
+
+        :param pretty: See `to_file`
+        :return: A str
+        """
+
+        if pretty:
+            return pformat(self)
+        return ElementTree.tostring(self, encoding='unicode')
 
 
 class Syllable(SVG):
-    def __init__(self, string):
-        super().__init__(0, 0, 30, 30)
-        self.insert(1, transcribe_syllable(string).create_element())
+    def __init__(self, string, merge=False, precision=None):
+        """
+        An SVG of a single syllable.
+
+        :param string: Syllable string
+        :param merge: If True, draw the whole syllable as one path
+        :param precision: Decimal places to round coordinates to, or
+            None to keep them as they are
+        """
+
+        super().__init__(0, 0, syllable_size, syllable_size)
+        syllable = transcribe_syllable(string)
+        if merge:
+            syllable = syllable.merge()
+        self.insert(1, syllable.create_element(precision))
+
+
+class Text(SVG):
+    def __init__(self, text, merge=None, precision=None, dedupe=False,
+                 id_prefix=None):
+        """
+        An SVG of a whole text, with one row of syllables per line.
+
+        :param text: Text with syllables separated by spaces and lines
+            separated by newlines, or a list of lines that are each a
+            list of (onset, nucleus, coda) tuples
+        :param merge: None to keep each shape as its own element,
+            'syllable' to draw each syllable as one path, or 'line' to
+            draw each line as one path
+        :param precision: Decimal places to round coordinates to, or
+            None to keep them as they are
+        :param dedupe: If True, draw each distinct line once and write
+            its repeats as <use> elements that refer to it
+        :param id_prefix: Start of the ids of repeated lines, when
+            `dedupe` is True. If None, it is made from the text, so that
+            different texts inlined in one page have different ids.
+        """
+
+        if isinstance(text, str):
+            text = [
+                [parse_syllable(string) for string in line.split(' ')]
+                for line in text.split('\n')]
+        text = [hashable_line(line) for line in text]
+        width = max(len(line) for line in text) * syllable_size
+        super().__init__(0, 0, width, len(text) * syllable_size)
+        sources = line_sources(text) if dedupe else None
+        if id_prefix is None and dedupe:
+            id_prefix = line_id_prefix(text)
+        for y, line in enumerate(text):
+            self.append(create_text_line(
+                line, y, sources, merge, precision, id_prefix))
 
 
 def pformat(xml_element, indent='\t'):
@@ -28,7 +132,15 @@ def pformat(xml_element, indent='\t'):
         indent=indent)
 
 
-def transcribe_syllable(text):
+def parse_syllable(text):
+    """
+    Split a syllable string into its parts.
+
+    :param text: Syllable string
+    :return: A tuple of (onset, nucleus, coda), where onset and coda
+        are tuples of consonant strings
+    """
+
     onset, nucleus, coda = [], '', []
     i = 0
     digraphs = [char for char in alphabet if len(char) != 1]
@@ -49,6 +161,18 @@ def transcribe_syllable(text):
         else:
             onset.append(char)
         i += 1
+    return tuple(onset), nucleus, tuple(coda)
+
+
+def create_syllable(onset, nucleus, coda):
+    """
+    Create the shapes of a syllable.
+
+    :param onset: A list of consonant strings
+    :param nucleus: A vowel string
+    :param coda: A list of consonant strings
+    :return: A Vowel with the consonants attached
+    """
 
     vowel = deepcopy(alphabet[nucleus])
     vowel.add_consonants(
@@ -58,5 +182,136 @@ def transcribe_syllable(text):
     return vowel
 
 
+@lru_cache(maxsize=syllable_cache_size)
+def pickled_syllable(onset, nucleus, coda):
+    """
+    Create the shapes of a syllable, pickled. The most recently used
+    syllables are kept, and unpickling a fresh copy of the shapes is
+    much faster than creating them again.
+
+    :return: A bytes object
+    """
+
+    return pickle.dumps(
+        create_syllable(onset, nucleus, coda), pickle.HIGHEST_PROTOCOL)
+
+
+def transcribe_syllable(text):
+    return create_syllable(*parse_syllable(text))
+
+
+def create_line(syllables, y=0):
+    """
+    Create the shapes of a line of syllables.
+
+    :param syllables: A list of (onset, nucleus, coda) tuples
+    :param y: Row of the line, in syllables from the top
+    :return: A Group with one shape per syllable
+    """
+
+    shapes = []
+    for x, (onset, nucleus, coda) in enumerate(syllables):
+        shape = pickle.loads(
+            pickled_syllable(tuple(onset), nucleus, tuple(coda)))
+        shape.translate(x * syllable_size, y * syllable_size)
+        shapes.append(shape)
+    return Group(*shapes)
+
+
+def create_line_element(syllables, y=0, merge=None, precision=None):
+    """
+    Create the XML Element of a line of syllables.
+
+    :param syllables: A list of (onset, nucleus, coda) tuples
+    :param y: Row of the line, in syllables from the top
+    :param merge: See `Text`
+    :param precision: See `Text`
+    :return: An instance of xml.etree.ElementTree.Element
+    """
+
+    if merge not in (None, 'syllable', 'line'):
+        raise ValueError(f'Unknown merge option: {merge!r}')
+    line = create_line(syllables, y)
+    if merge == 'syllable':
+        line = Group(*[syllable.merge() for syllable in line.items])
+    elif merge == 'line':
+        line = line.merge()
+    return line.create_element(precision)
+
+
+def hashable_line(line):
+    """
+    Get a line of syllables as tuples, so that it can be used as a key
+    of the caches and of `line_sources`.
+    """
+
+    return tuple(
+        (tuple(onset), nucleus, tuple(coda))
+        for onset, nucleus, coda in line)
+
+
+def line_sources(lines):
+    """
+    Find the lines of a text that repeat an earlier line.
+
+    :param lines: A list of lines from `hashable_line`
+    :return: A tuple of (list of the row where each line first appears,
+        set of the rows that later lines repeat)
+    """
+
+    first_rows = {}
+    sources = [
+        first_rows.setdefault(line, row) for row, line in enumerate(lines)]
+    repeated = {source for row, source in enumerate(sources) if source != row}
+    return sources, repeated
+
+
+def line_id_prefix(lines):
+    """Make an id prefix for the repeated lines of a text."""
+    return f'l{zlib.crc32(repr(lines).encode("utf-8")):08x}-'
+
+
+def create_text_line(line, y, sources=None, merge=None, precision=None,
+                     id_prefix='line'):
+    """
+    Create the XML Element of one line of a text. A line that repeats an
+    earlier one is a <use> element that refers to it, and a line that is
+    repeated later gets an id.
+
+    :param line: A line from `hashable_line`
+    :param y: Row of the line, in syllables from the top
+    :param sources: The result of `line_sources`, or None to draw every
+        line
+    :param merge: See `Text`
+    :param precision: See `Text`
+    :param id_prefix: Start of the ids of repeated lines
+    :return: An instance of xml.etree.ElementTree.Element
+    """
+
+    first_rows, repeated = sources if sources is not None else (None, ())
+    if first_rows is not None and first_rows[y] != y:
+        href = f'#{id_prefix}{first_rows[y]}'
+        return ElementTree.Element('use', attrib={
+            '{http://www.w3.org/1999/xlink}href': href,
+            'y': str((y - first_rows[y]) * syllable_size)})
+    element = create_line_element(line, y, merge, precision)
+    if y in repeated:
+        element.set('id', f'{id_prefix}{y}')
+    return element
+
+
+def transcribe_line(text, y=0):
+    """
+    Transcribe a line of syllables separated by spaces.
+
+    :param text: Line string
+    :param y: Row of the line, in syllables from the top
+    :return: A Group with one shape per syllable
+    """
+
+    return create_line(
+        [parse_syllable(string) for string in text.split(' ')], y)
+
+
 if __name__ == '__main__':
     Syllable('test').to_file('tests/test.svg')
@@ -0,0 +1,195 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from png import alphabet
+from png import write as png_write
+
+
+class TiledDocument:
+    def __init__(self, text):
+        """
+        A text that renders only the syllables inside a region. Lines
+        are only found and parsed when they are drawn, so a region near
+        the top renders in the same time no matter how long the
+        document is.
+
+        :param text: Text with syllables separated by spaces and lines
+            separated by newlines
+        """
+
+        self.text = text
+        self.rows = text.count('\n') + 1
+        self.columns = None  # only counted when the size is needed
+        self.line_starts = [0]  # index of the lines found so far
+        self.syllable_images = {}
+
+    def line(self, row):
+        """Get the text of one line."""
+        while len(self.line_starts) <= row:
+            end = self.text.find('\n', self.line_starts[-1])
+            self.line_starts.append(end + 1)
+        start = self.line_starts[row]
+        end = self.text.find('\n', start)
+        return self.text[start:] if end == -1 else self.text[start:end]
+
+    def size(self, scale=1):
+        """Get the (width, height) of the whole document in pixels."""
+        if self.columns is None:
+            self.columns = max(
+                line.count(' ') + 1 for line in self.text.split('\n'))
+        return (
+            self.columns * alphabet.syllable_width * scale,
+            self.rows * alphabet.syllable_height * scale)
+
+    def syllable_image(self, string, scale):
+        key = (string, scale)
+        if key not in self.syllable_images:
+            self.syllable_images[key] = png_write.transcribe_syllable(
+                string, scale)
+        return self.syllable_images[key]
+
+    def render_region(self, x, y, width, height, scale=1):
+        """
+        Render part of the document.
+
+        :param x: Left edge of the region, in pixels at `scale`
+        :param y: Top edge of the region, in pixels at `scale`
+        :param width: Width of the region in pixels
+        :param height: Height of the region in pixels
+        :param scale: An integer scale factor
+        :return: An Image
+        """
+
+        syllable_width = alphabet.syllable_width * scale
+        syllable_height = alphabet.syllable_height * scale
+        image = Image.new('RGBA', (width, height), (255, 255, 255, 255))
+        first_row = max(0, y // syllable_height)
+        last_row = min(self.rows - 1, (y + height - 1) // syllable_height)
+        first_column = max(0, x // syllable_width)
+        last_column = (x + width - 1) // syllable_width
+        for row in range(first_row, last_row + 1):
+            syllables = self.line(row).split(' ')
+            for column in range(
+                    first_column, min(last_column + 1, len(syllables))):
+                image.paste(
+                    self.syllable_image(syllables[column], scale),
+                    (column * syllable_width - x,
+                     row * syllable_height - y))
+        return image
+
+
+document = None  # the TiledDocument of each pyramid worker process
+
+
+def set_document(text):
+    global document
+    document = TiledDocument(text)
+
+
+def level_size(size, level, max_level):
+    """Get the size of a Deep Zoom level."""
+    width, height = size
+    divisor = 2 ** (max_level - level)
+    return math.ceil(width / divisor), math.ceil(height / divisor)
+
+
+def tile_path(directory, level, column, row):
+    return os.path.join(directory, str(level), f'{column}_{row}.png')
+
+
+def write_tile(directory, level, column, row, tile_size, scale):
+    """Render a full-resolution tile straight from the document."""
+    x, y = column * tile_size, row * tile_size
+    width, height = document.size(scale)
+    document.render_region(
+        x, y, min(tile_size, width - x), min(tile_size, height - y),
+        scale).save(tile_path(directory, level, column, row))
+
+
+def write_reduced_tile(directory, level, column, row, tile_size):
+    """Build a tile from the (up to) four tiles below it, at half size."""
+    children = []
+    for child_row in (row * 2, row * 2 + 1):
+        for child_column in (column * 2, column * 2 + 1):
+            path = tile_path(directory, level + 1, child_column, child_row)
+            if os.path.exists(path):
+                with Image.open(path) as image:
+                    image.load()
+                children.append((child_column - column * 2,
+                                 child_row - row * 2, image))
+    width = sum(image.width for x, y, image in children if y == 0)
+    height = sum(image.height for x, y, image in children if x == 0)
+    combined = Image.new('RGBA', (width, height), (255, 255, 255, 255))
+    for x, y, image in children:
+        combined.paste(image, (x * tile_size, y * tile_size))
+    combined.resize(
+        (math.ceil(width / 2), math.ceil(height / 2)), Image.BOX).save(
+            tile_path(directory, level, column, row))
+
+
+def write_pyramid(text, directory, name='document', scale=1, tile_size=256,
+                  workers=None):
+    """
+    Write a Deep Zoom tile pyramid of a text. The full-resolution tiles
+    are rendered in parallel straight from the text, and each smaller
+    level is built from the one above it.
+
+    :param text: Text with syllables separated by spaces and lines
+        separated by newlines
+    :param directory: Directory to write `name`.dzi and `name`_files to
+    :param name: Name of the pyramid
+    :param scale: An integer scale factor for the full-resolution level
+    :param tile_size: Width and height of the tiles in pixels
+    :param workers: Number of worker processes, or None for one per CPU
+    """
+
+    size = TiledDocument(text).size(scale)
+    max_level = math.ceil(math.log2(max(size)))
+    files = os.path.join(directory, f'{name}_files')
+    with ProcessPoolExecutor(
+            workers, initializer=set_document, initargs=(text,)) as executor:
+        for level in range(max_level, -1, -1):
+            os.makedirs(os.path.join(files, str(level)), exist_ok=True)
+            width, height = level_size(size, level, max_level)
+            tiles = [
+                (column, row)
+                for row in range(math.ceil(height / tile_size))
+                for column in range(math.ceil(width / tile_size))]
+            if level == max_level:
+                futures = [
+                    executor.submit(
+                        write_tile, files, level, column, row,
+                        tile_size, scale)
+                    for column, row in tiles]
+            else:
+                futures = [
+                    executor.submit(
+                        write_reduced_tile, files, level, column, row,
+                        tile_size)
+                    for column, row in tiles]
+            for future in futures:
+                future.result()
+
+    with open(os.path.join(directory, f'{name}.dzi'), 'w') as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+            f'Format="png" Overlap="0" TileSize="{tile_size}">'
+            f'<Size Width="{size[0]}" Height="{size[1]}"/></Image>\n')
+
+
+if __name__ == '__main__':
+    if not os.path.isdir('tests'):
+        os.mkdir('tests')
+
+    anthem = (
+        "ju 'ar so swit\n"
+        "dan sin tu da bit\n"
+        "derz 'a mit mar kit\n"
+        "dawn da stit\n"
+        "da bojz 'and da gilz\n"
+        "wats its 'o der it")
+    write_pyramid('\n'.join([anthem] * 100), 'tests', 'anthem', scale=4)